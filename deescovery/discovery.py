@@ -2,13 +2,17 @@
 # Ref: https://github.com/python/mypy/issues/5485
 import abc
 import inspect
+from contextlib import ExitStack
 from dataclasses import dataclass
 from importlib import import_module
 from logging import getLogger
-from typing import Any, Callable, List
+from typing import TYPE_CHECKING, Any, Callable, List, Optional
 
 from deescovery.contrib import find_modules
 
+if TYPE_CHECKING:
+    from deescovery.profiling import ImportProfiler
+
 ModuleMatches = Callable[[str], bool]
 ModuleAction = Callable[[str], Any]
 ObjectMatches = Callable[[Any], bool]
@@ -147,7 +151,11 @@ class ObjectRule(IRule):
             self.object_action(obj)  # type: ignore
 
 
-def discover(import_path: str, rules: List[IRule]):
+def discover(
+    import_path: str,
+    rules: List[IRule],
+    import_profiler: Optional["ImportProfiler"] = None,
+):
     """Discover all objects.
 
     Scan the package, find all modules and objects, matching the given set of rules,
@@ -161,7 +169,15 @@ def discover(import_path: str, rules: List[IRule]):
             match specification and the action, if the object matches.  Normally, it's
             a list IRule subclasses: [ModuleRule][deescovery.discovery.ModuleRule] or
             [ObjectRule][deescovery.discovery.ObjectRule].
+        import_profiler: an optional
+            [ImportProfiler][deescovery.profiling.ImportProfiler] instance. If
+            provided, the profiler hooks the import system while the discovery runs,
+            and records the modules loaded by discovered modules and packages,
+            along with their import time and memory.
     """
-    for module_name in find_modules(import_path=import_path, recursive=True):
-        for rule in rules:
-            rule.discover(module_name)
+    with ExitStack() as stack:
+        if import_profiler is not None:
+            stack.enter_context(import_profiler)
+        for module_name in find_modules(import_path=import_path, recursive=True):
+            for rule in rules:
+                rule.discover(module_name)
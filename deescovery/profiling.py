@@ -0,0 +1,254 @@
+"""Import cost attribution for discovered modules.
+
+Importing a single discovered module (say, `myapp.billing.models`) can pull in
+heavy third-party dependencies. The import profiler hooks the import system while
+[deescovery.discover][deescovery.discovery.discover] runs and records every
+module loaded along the way in a tree, under the module that triggered it.
+
+**Example:**
+
+```python
+from deescovery import discover, ModuleRule
+from deescovery.matchers import MatchByPattern
+from deescovery.profiling import ImportProfiler
+
+profiler = ImportProfiler()
+rule = ModuleRule(
+    name="Models loader",
+    module_matches=MatchByPattern(["*.models"]),
+)
+discover("myapp", [rule], import_profiler=profiler)
+
+with open("imports.json", "w") as fobj:
+    fobj.write(profiler.to_json(indent=2))
+```
+"""
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class ImportRecord:
+    """A module, loaded while the profiler was active.
+
+    Attributes:
+        name: the module name.
+        duration: cumulative time in seconds spent creating the module and executing
+            its body, including the time spent loading all modules it imported.
+            For C extensions, module creation runs the extension initialization.
+        memory: cumulative net size in bytes of memory allocated while loading the
+            module, as reported by `tracemalloc`. Memory freed during the import
+            is subtracted, so the value can be negative.
+        peak: the peak of memory in bytes allocated while loading the module,
+            relative to the memory allocated before the import. None on Python
+            versions before 3.9, where `tracemalloc.reset_peak()` is missing, and
+            when `tracemalloc` was already tracing before the profiler started.
+        error: the exception, raised while loading the module, formatted as
+            "ExceptionType: message". None if the module was imported successfully.
+        imports: modules, loaded for the first time while loading the module.
+    """
+
+    name: str
+    duration: float = 0.0
+    memory: int = 0
+    peak: Optional[int] = None
+    error: Optional[str] = None
+    imports: List["ImportRecord"] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "duration": self.duration,
+            "memory": self.memory,
+            "peak": self.peak,
+            "error": self.error,
+            "imports": [record.to_dict() for record in self.imports],
+        }
+
+
+@dataclass(eq=False)
+class ImportProfiler(MetaPathFinder):
+    """Import graph builder, attributing import costs to discovered modules.
+
+    Pass the instance to [deescovery.discover][deescovery.discovery.discover]
+    to collect the graph, then inspect `modules` or export it with `to_json()`.
+
+    Only modules loaded for the first time are recorded. Modules already present
+    in `sys.modules` cost nothing to import and don't show up in the graph. The
+    profiler is not thread-safe: modules loaded by other threads while the
+    discovery is in progress are attributed to the module being loaded at the time.
+
+    The profiler starts `tracemalloc` if it's not tracing yet, and stops it on exit.
+    If `tracemalloc` is already tracing, the profiler leaves its peak intact and
+    doesn't record peaks of imported modules.
+
+    Attributes:
+        modules: a mapping from the module name to its
+            [ImportRecord][deescovery.profiling.ImportRecord], for all modules
+            loaded directly by the discovery process. These are discovered modules
+            and packages, imported while scanning the project, with transitive
+            imports of their `__init__.py` files. A discovered module is missing
+            if it was already imported before, or if another module imported it
+            first. In the latter case, its record is nested in the importer's tree.
+    """
+
+    modules: Dict[str, ImportRecord] = field(default_factory=dict)
+    _stack: List["_ImportFrame"] = field(default_factory=list, init=False, repr=False)
+    _started_tracemalloc: bool = field(default=False, init=False, repr=False)
+
+    def __enter__(self) -> "ImportProfiler":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def find_spec(self, fullname, path, target=None):
+        # Only consult the finders after the profiler. Going through the entire
+        # sys.meta_path would call other profilers, and they would call us back.
+        if self not in sys.meta_path:
+            return None
+        finders = sys.meta_path[sys.meta_path.index(self) + 1 :]
+        for finder in finders:
+            if not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _ProfilingLoader(spec.loader, self)
+            return spec
+        return None
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            module_name: record.to_dict()
+            for module_name, record in self.modules.items()
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """Export the import graph as a JSON string.
+
+        Args:
+            **kwargs: extra arguments passed as-is to `json.dumps()`.
+
+        Returns:
+            A JSON object, mapping module names to serialized
+            [ImportRecord][deescovery.profiling.ImportRecord] trees.
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+    @property
+    def _tracks_peak(self) -> bool:
+        return self._started_tracemalloc and hasattr(tracemalloc, "reset_peak")
+
+    def _start_import(self, module_name: str) -> "_ImportFrame":
+        if self._tracks_peak:
+            # Resetting the peak for the nested import loses the peak of the
+            # parent so far. Keep it aside, and merge it back when the nested
+            # import is done.
+            if self._stack:
+                self._stack[-1].merge_peak(tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        memory_before = tracemalloc.get_traced_memory()[0]
+        frame = _ImportFrame(
+            record=ImportRecord(name=module_name),
+            parent=self._stack[-1].record if self._stack else None,
+            time_before=time.perf_counter(),
+            memory_before=memory_before,
+            peak=memory_before,
+        )
+        self._stack.append(frame)
+        return frame
+
+    def _finish_import(
+        self, frame: "_ImportFrame", exc: Optional[BaseException] = None
+    ) -> None:
+        record = frame.record
+        record.duration = time.perf_counter() - frame.time_before
+        memory_after, peak = tracemalloc.get_traced_memory()
+        record.memory = memory_after - frame.memory_before
+        if exc is not None:
+            record.error = f"{type(exc).__name__}: {exc}"
+        self._stack.remove(frame)
+        if self._tracks_peak:
+            frame.merge_peak(peak)
+            record.peak = frame.peak - frame.memory_before
+            if self._stack:
+                self._stack[-1].merge_peak(frame.peak)
+        if frame.parent is None:
+            self.modules[record.name] = record
+        else:
+            frame.parent.imports.append(record)
+
+
+@dataclass(eq=False)
+class _ImportFrame:
+    """The state of the module import in progress."""
+
+    record: ImportRecord
+    parent: Optional[ImportRecord]
+    time_before: float
+    memory_before: int
+    peak: int
+
+    def merge_peak(self, peak: int) -> None:
+        self.peak = max(self.peak, peak)
+
+
+class _ProfilingLoader:
+    """Loader proxy, measuring the module creation and execution with the profiler.
+
+    The measurement starts in `create_module()`, where C extensions run their
+    initialization, and ends after `exec_module()`.
+    """
+
+    def __init__(self, loader, profiler: ImportProfiler):
+        self._loader = loader
+        self._profiler = profiler
+        self._frame: Optional[_ImportFrame] = None
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        self._frame = self._profiler._start_import(spec.name)
+        if not hasattr(self._loader, "create_module"):
+            return None
+        try:
+            return self._loader.create_module(spec)
+        except BaseException as exc:
+            self._finish(exc)
+            raise
+
+    def exec_module(self, module) -> None:
+        # Don't leak the proxy to the module: code like importlib.resources
+        # inspects the loader type.
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        if self._frame is None:
+            self._frame = self._profiler._start_import(module.__name__)
+        try:
+            self._loader.exec_module(module)
+        except BaseException as exc:
+            self._finish(exc)
+            raise
+        self._finish()
+
+    def _finish(self, exc: Optional[BaseException] = None) -> None:
+        if self._frame is not None:
+            self._profiler._finish_import(self._frame, exc)
+            self._frame = None
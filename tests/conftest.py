@@ -25,6 +25,27 @@ def sample_project(tmpdir):
     sys.path = sys.path[1:]
 
 
+@pytest.fixture
+def heavy_project(tmpdir):
+    """Return a sample project, whose modules pull in dependencies."""
+    tmpdir = pathlib.Path(tmpdir)
+    (tmpdir / "heavy_project").mkdir()
+    (tmpdir / "heavy_project" / "__init__.py").write_text("")
+    (tmpdir / "heavy_project" / "views.py").write_text(heavy_views)
+    (tmpdir / "heavy_project" / "billing").mkdir()
+    (tmpdir / "heavy_project" / "billing" / "__init__.py").write_text(heavy_billing)
+    (tmpdir / "heavy_project" / "billing" / "models.py").write_text(heavy_models)
+    (tmpdir / "heavy_dependency.py").write_text(heavy_dependency)
+    (tmpdir / "heavy_sdk.py").write_text(heavy_dependency)
+    (tmpdir / "broken_dependency.py").write_text(broken_dependency)
+    sys.path.insert(0, tmpdir.as_posix())
+    modules_before = set(sys.modules)
+    yield tmpdir
+    sys.path = sys.path[1:]
+    for module_name in set(sys.modules) - modules_before:
+        del sys.modules[module_name]
+
+
 services = """
 class App():
     app = None
@@ -50,3 +71,27 @@ from flask.cli import AppGroup
 
 app_group = AppGroup("users")
 """
+
+heavy_billing = """
+import heavy_sdk
+"""
+
+heavy_models = """
+import json
+import heavy_dependency
+"""
+
+heavy_views = """
+try:
+    import broken_dependency
+except RuntimeError:
+    pass
+"""
+
+heavy_dependency = """
+payload = [object() for _ in range(10000)]
+"""
+
+broken_dependency = """
+raise RuntimeError("broken")
+"""
@@ -0,0 +1,173 @@
+import json
+import pathlib
+import subprocess
+import sys
+import textwrap
+import tracemalloc
+
+import pytest
+
+from deescovery import ModuleRule, discover
+from deescovery.matchers import MatchByPattern
+from deescovery.profiling import ImportProfiler
+
+
+@pytest.fixture
+def tracing_before():
+    """Return the tracemalloc state before the test."""
+    return tracemalloc.is_tracing()
+
+
+@pytest.fixture
+def profiler(heavy_project: pathlib.Path, tracing_before: bool) -> ImportProfiler:
+    """Return a profiler, populated by the discovery of the heavy project."""
+    import_profiler = ImportProfiler()
+    rule = ModuleRule(name="Module loader", module_matches=lambda name: True)
+    discover("heavy_project", [rule], import_profiler=import_profiler)
+    return import_profiler
+
+
+def test_import_profiler_should_attribute_imports_to_discovered_modules(
+    profiler: ImportProfiler,
+):
+    models_record = profiler.modules["heavy_project.billing.models"]
+    [dependency_record] = models_record.imports
+    assert dependency_record.name == "heavy_dependency"
+    assert dependency_record.memory > 0
+    assert models_record.duration >= dependency_record.duration > 0
+    assert models_record.memory >= dependency_record.memory
+
+
+def test_import_profiler_should_attribute_package_imports_to_packages(
+    profiler: ImportProfiler,
+):
+    billing_record = profiler.modules["heavy_project.billing"]
+    assert [record.name for record in billing_record.imports] == ["heavy_sdk"]
+
+
+def test_import_profiler_should_skip_already_imported_modules(
+    profiler: ImportProfiler,
+):
+    # "json" is imported by heavy_project.billing.models, but it's already loaded
+    assert "json" in sys.modules
+    assert "json" not in profiler.to_json()
+
+
+def test_import_profiler_should_mark_failed_imports(profiler: ImportProfiler):
+    views_record = profiler.modules["heavy_project.views"]
+    assert views_record.error is None
+    [broken_record] = views_record.imports
+    assert broken_record.name == "broken_dependency"
+    assert broken_record.error == "RuntimeError: broken"
+
+
+@pytest.mark.skipif(
+    not hasattr(tracemalloc, "reset_peak") or tracemalloc.is_tracing(),
+    reason="requires Python 3.9+ and tracemalloc, started by the profiler",
+)
+def test_import_profiler_should_record_peak_memory(profiler: ImportProfiler):
+    models_record = profiler.modules["heavy_project.billing.models"]
+    [dependency_record] = models_record.imports
+    assert dependency_record.peak >= dependency_record.memory > 0
+    assert models_record.peak >= dependency_record.peak
+
+
+def test_import_profiler_should_restore_import_system(
+    profiler: ImportProfiler, tracing_before: bool
+):
+    assert profiler not in sys.meta_path
+    assert tracemalloc.is_tracing() == tracing_before
+    module = sys.modules["heavy_project.billing.models"]
+    assert module.__loader__ is module.__spec__.loader
+    assert type(module.__loader__).__name__ == "SourceFileLoader"
+
+
+def test_import_profiler_should_restore_import_system_on_errors(
+    heavy_project: pathlib.Path, tracing_before: bool
+):
+    profiler = ImportProfiler()
+    rule = ModuleRule(
+        name="Broken loader",
+        module_matches=MatchByPattern(["*.models"]),
+        module_action=lambda name: __import__("broken_dependency"),
+    )
+    with pytest.raises(RuntimeError):
+        discover("heavy_project", [rule], import_profiler=profiler)
+    assert profiler not in sys.meta_path
+    assert tracemalloc.is_tracing() == tracing_before
+    assert profiler.modules["broken_dependency"].error == "RuntimeError: broken"
+
+
+@pytest.mark.skipif(
+    not hasattr(tracemalloc, "reset_peak"), reason="requires Python 3.9+"
+)
+def test_import_profiler_should_keep_caller_peak(heavy_project: pathlib.Path):
+    tracing_before = tracemalloc.is_tracing()
+    if not tracing_before:
+        tracemalloc.start()
+    try:
+        payload = bytearray(10_000_000)
+        del payload
+        peak_before = tracemalloc.get_traced_memory()[1]
+        profiler = ImportProfiler()
+        rule = ModuleRule(name="Module loader", module_matches=lambda name: True)
+        discover("heavy_project", [rule], import_profiler=profiler)
+        assert tracemalloc.get_traced_memory()[1] >= peak_before
+        assert profiler.modules["heavy_project.billing.models"].peak is None
+    finally:
+        if not tracing_before:
+            tracemalloc.stop()
+
+
+def test_import_profilers_should_nest(heavy_project: pathlib.Path):
+    outer_profiler = ImportProfiler()
+    inner_profiler = ImportProfiler()
+    with outer_profiler:
+        with inner_profiler:
+            import heavy_dependency  # noqa: F401
+    assert sys.meta_path.count(outer_profiler) == 0
+    assert sys.meta_path.count(inner_profiler) == 0
+    assert list(outer_profiler.modules) == ["heavy_dependency"]
+    assert list(inner_profiler.modules) == ["heavy_dependency"]
+
+
+def test_import_profiler_should_measure_extension_initialization():
+    # Run in a subprocess: the extension is likely imported by pytest already
+    code = textwrap.dedent(
+        """
+        import sys
+        from deescovery.profiling import ImportProfiler
+
+        assert "_elementtree" not in sys.modules
+        with ImportProfiler() as profiler:
+            import _elementtree
+        print(profiler.to_json())
+        """
+    )
+    root = pathlib.Path(__file__).parent.parent
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    graph = json.loads(output)
+    assert list(graph) == ["_elementtree"]
+    imports = [record["name"] for record in graph["_elementtree"]["imports"]]
+    assert "pyexpat" in imports
+    assert "xml.etree.ElementPath" in imports
+
+
+def test_import_profiler_should_export_json(profiler: ImportProfiler):
+    graph = json.loads(profiler.to_json())
+    models_record = graph["heavy_project.billing.models"]
+    assert models_record["imports"][0]["name"] == "heavy_dependency"
+    assert set(models_record) == {
+        "name",
+        "duration",
+        "memory",
+        "peak",
+        "error",
+        "imports",
+    }